@@ -0,0 +1,6 @@
+"""Allow running TerminAI with `python -m terminai`."""
+
+from .cli.main import main
+
+if __name__ == "__main__":
+    main()
@@ -3,58 +3,130 @@ Implementation of the 'ask' command for TerminAI.
 This handler is responsible for processing user's query, gathering relevant terminal context, generating ai response and displaying the result to the user.
 """
 
-import click    # For cli functionality
-from rich.console import Console
-from rich.prompt import Confirm
-import subprocess
+import re
+import shlex
+import shutil
+from typing import Any, Dict, List, Optional
 
 # Relative imports
-from ..core.ai import generate_ai_response
+from ..core.ai import generate_ai_response_stream
 from ..core.context import get_terminal_context
 
-console = Console()
+__all__ = ["handle_ask_command"]
 
-def handle_ask_command(query: str) -> None:
-    """Handle the 'ask' command"""
-    console.print(f"[bold green]Processing query:[/bold green] {query}")
+# Characters that need a shell to interpret them (pipes, redirects, expansions, globs, control operators)
+_SHELL_METACHARS = re.compile(r'[|&;<>()$`\\*?\[\]{}~!#\n]')
+
+_console = None
+
+def _get_console():
+    """Create the console on first use, so rich is only imported when a handler runs"""
+    global _console
+    if _console is None:
+        from ..core.console import BufferedConsole
+        _console = BufferedConsole()
+    return _console
+
+def handle_ask_command(query: str, context: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Handle the 'ask' command
+    
+    Args:
+        query: The user's question
+        context: Terminal context gathered by the caller. If None, it is gathered here
+    """
+    from rich.markup import escape
+    from rich.prompt import Confirm
+    from ..core.console import stream_text
+    
+    console = _get_console()
+    console.write(f"[bold green]Processing query:[/bold green] {escape(query)}")
     
     try:
-        # Get terminal context
-        context = get_terminal_context()
+        # Get terminal context, unless the caller already has it
+        if context is None:
+            context = get_terminal_context()
         
-        # Generate AI response
-        console.print("[yellow]Thinking...[/yellow]")
-        response = generate_ai_response(query, context, command_type="ask")
+        # Generate AI response, displaying it as it streams in
+        console.write("[yellow]Thinking...[/yellow]")
+        console.write("\n[bold cyan]Suggested command:[/bold cyan]")
+        console.flush()
+        response = stream_text(console, generate_ai_response_stream(query, context, command_type="ask"), style="green")
         
-        # Display the response 
-        console.print("\n[bold cyan]Suggested command:[/bold cyan]")
-        console.print(f"[green]{response}[/green]")
+        # Commands without shell syntax are executed directly, skipping the /bin/sh fork
+        command = response.strip()
+        argv = _split_simple_command(command)
+        if argv is None:
+            console.print("[yellow]Note: this command uses shell features and will be run through your shell.[/yellow]")
         
         # Ask user if they want to run the command
         if Confirm.ask("Run this command?"):
             console.print("[yellow]Executing command...[/yellow]")
+            import subprocess       # Only needed once the user accepts the command
+            import threading
             
-            # Execute the command
-            process = subprocess.run(
-                response,
+            # Execute the command, streaming its output as it is produced
+            process = subprocess.Popen(
+                argv if argv is not None else command,
                 # TODO: Add additional safeguards for untrusted input passed to shell
-                shell = True,               # Command is executed through the shell 
-                capture_output = True,      # Captures stdout and stderr
-                text = True                 # Ensures output is decoded as text
+                shell = argv is None,       # Only commands that need it are executed through the shell 
+                stdout = subprocess.PIPE,
+                stderr = subprocess.PIPE,
+                text = True,                # Ensures output is decoded as text
+                bufsize = 1                 # Line buffered, so output appears as each line completes
             )
             
-            # Display the command output
-            if process.stdout:
-                console.print("[bold]Output:[/bold]")
-            console.print(process.stdout)
-        
-            if process.stderr:
-                console.print("[bold red]Error:[/bold red]")
-                console.print(process.stderr)
+            # Drain stderr on a separate thread so neither pipe can fill up and block the command
+            stderr_thread = threading.Thread(
+                target=_stream_pipe,
+                args=(process.stderr, console, "[bold red]Error:[/bold red]", "red"),
+                daemon=True
+            )
+            stderr_thread.start()
+            _stream_pipe(process.stdout, console, "[bold]Output:[/bold]")
+            stderr_thread.join()
+            returncode = process.wait()
             
-            console.print(f"[bold green]Command executed with return code: {process.returncode}[/bold green]")
+            console.print(f"[bold green]Command executed with return code: {returncode}[/bold green]")
         else: 
             console.print("[yellow]Command not executed[/yellow]")
     except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
-        
\ No newline at end of file
+        console.flush()         # Don't drop status lines queued before the failure
+        console.print(f"[bold red]Error:[/bold red] {escape(str(e))}")
+
+def _split_simple_command(command: str) -> Optional[List[str]]:
+    """
+    Split a command into arguments if it can be executed without a shell.
+    
+    Args:
+        command: The command string suggested by the AI
+        
+    Returns:
+        Argument list, or None if the command uses shell syntax, sets variables or isn't an executable (e.g. a builtin)
+    """
+    if _SHELL_METACHARS.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:      # Unbalanced quotes
+        return None
+    if not argv or "=" in argv[0] or shutil.which(argv[0]) is None:
+        return None
+    return argv
+
+def _stream_pipe(pipe, console, header: str, style: Optional[str] = None) -> None:
+    """
+    Echo a subprocess pipe to the console line by line.
+    
+    Args:
+        pipe: Text-mode pipe to read from
+        console: Console to write to
+        header: Markup printed before the first line, if any output arrives
+        style: Optional style applied to each line
+    """
+    with pipe:
+        for i, line in enumerate(pipe):
+            if i == 0:
+                console.print(header)
+            # console.out skips markup parsing, so command output is shown verbatim
+            console.out(line, end="", style=style, highlight=False)
@@ -2,20 +2,50 @@
 Implementation of the 'debug' command for TerminAI.
 This handles debugging terminal errors using AI assistance.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
+from ..core.ai import generate_ai_response_stream
+from ..core.context import get_recent_commands_with_outputs, get_terminal_context
 
-from terminai.cli.commands.init import get_recent_commands_with_outputs
+__all__ = ["handle_debug_command", "build_debug_prompt"]
 
-from ..core.ai import generate_ai_response
-from ..core.context import get_terminal_context
+_console = None
 
-console = Console()
+def _get_console():
+    """Create the console on first use, so rich is only imported when a handler runs"""
+    global _console
+    if _console is None:
+        from ..core.console import BufferedConsole
+        _console = BufferedConsole()
+    return _console
 
-def handle_debug_command(error_message: Optional[str] = None, include_context: bool = False, auto_analyse: bool = False) -> None:
+# Prompt headers for build_debug_prompt, defined once rather than rebuilt on every call
+_AUTO_HEADER = """
+I need you to analyze my recent terminal activity.
+
+Please:
+1. Explain what these commands are doing
+2. Identify any errors or inefficiencies
+3. Suggest improvements or best practices
+4. Provide educational context about the commands
+
+Format your response as markdown with clear sections.
+"""
+
+_ERROR_HEADER = """
+I received this error in my terminal: "{err}"
+
+Please explain:
+1. What this error means
+2. The most likely cause
+3. How to fix it
+4. How to prevent it in the future
+
+Format your response as markdown with clear sections.
+"""
+
+def handle_debug_command(error_message: Optional[str] = None, include_context: bool = False, auto_analyse: bool = False,
+                         context: Optional[Dict[str, Any]] = None) -> None:
     """
     Handle the 'debug' command by analyzing terminal errors or activity.
     
@@ -23,26 +53,33 @@ def handle_debug_command(error_message: Optional[str] = None, include_context: b
         error_message: The error message to analyze (optional if auto_analyze is True)
         include_context: Whether to include recent command history as context
         auto_analyze: Whether to automatically analyze recent terminal activity
+        context: Terminal context gathered by the caller. If None, it is gathered here
     """
+    from rich.markup import escape
+    from rich.panel import Panel
+    from ..core.console import stream_markdown
     
-    # Get command history if context is requested
-    history_data = get_recent_commands_with_outputs() if include_context else {"commands": [], "has_outputs": False}
+    console = _get_console()
+    
+    # Get command history if context is requested, along with the terminal context
+    history_data, context = _gather_history_and_context(include_context, context)
     
     # For auto-analyze mode, we need to infer the problem from recent activity
     if auto_analyse:
         if not history_data["commands"]:
-            console.print("[bold yellow]No recent command history found.[/bold yellow]")
-            console.print("Run [bold]terminai init[/bold] to set up command logging first.")
+            console.write("[bold yellow]No recent command history found.[/bold yellow]")
+            console.write("Run [bold]terminai init[/bold] to set up command logging first.")
+            console.flush()
             return
 
-        console.print("[bold cyan]Analyzing your recent terminal activity...[/bold cyan]")
+        console.write("[bold cyan]Analyzing your recent terminal activity...[/bold cyan]")
         
         # Find the most recent failed command
         error_detected = False
-        for cmd in history_data["commands"]:
-            if cmd.get("exit_code", 0) != 0:
+        for command, exit_code in zip(history_data["commands"], history_data["exit_codes"]):
+            if exit_code != 0:
                 if not error_message:
-                    error_message = f"Command failed: {cmd['command']}"
+                    error_message = f"Command failed: {command}"
                 error_detected = True
                 break
         
@@ -52,117 +89,144 @@ def handle_debug_command(error_message: Optional[str] = None, include_context: b
         
     # Error message is required if not auto-analysing 
     if not error_message and not auto_analyse:
-        console.print("[bold yellow]Please provide an error message to analyze.[/bold yellow]")
-        console.print("Example: [bold]terminai debug \"permission denied\"[/bold]")
-        console.print("Or use [bold]terminai debug -a[/bold] to automatically analyze recent activity.")
+        console.write("[bold yellow]Please provide an error message to analyze.[/bold yellow]")
+        console.write("Example: [bold]terminai debug \"permission denied\"[/bold]")
+        console.write("Or use [bold]terminai debug -a[/bold] to automatically analyze recent activity.")
+        console.flush()
         return
     
     if error_message:
-        console.print(f"[bold yellow]Analyzing error:[/bold yellow] {error_message}")
+        console.write(f"[bold yellow]Analyzing error:[/bold yellow] {escape(error_message)}")
     
     try: 
-        # Get terminal context
-        context = get_terminal_context()
-        
         # Add command history 
+        history = None
         if include_context and history_data["commands"]:
-            context["recent_commands"] = history_data["commands"]
-            console.print(f"[dim]Including context from your last {len(history_data['commands'])} commands...[/dim]")
+            history = history_data
+            context["recent_commands"] = _history_payload(history_data)
+            console.write(f"[dim]Including context from your last {len(history_data['commands'])} commands...[/dim]")
             if history_data.get("has_outputs"):
-                console.print("[dim]Including command outputs in analysis...[/dim]")
+                console.write("[dim]Including command outputs in analysis...[/dim]")
         
         
         # Build prompt with available context
-        debug_prompt = build_debug_prompt(error_message, context, auto_analyse)
-        
-        # Generate response using AI
-        console.print("[yellow]Analyzing...[/yellow]")
-        response = generate_ai_response(debug_prompt, context, command_type="debug")
-        
-        # Display the formatted response
-        console.print("\n[bold cyan]Terminal Analysis:[/bold cyan]")
-        console.print(Panel(Markdown(response), title="TerminAI Debug Results", border_style="cyan"))
+        debug_prompt = build_debug_prompt(error_message, context, auto_analyse, history)
+        
+        # Generate response using AI, rendering it as it streams in
+        console.write("[yellow]Analyzing...[/yellow]")
+        console.write("\n[bold cyan]Terminal Analysis:[/bold cyan]")
+        console.flush()
+        stream_markdown(
+            console,
+            generate_ai_response_stream(debug_prompt, context, command_type="debug"),
+            wrap=lambda body: Panel(body, title="TerminAI Debug Results", border_style="cyan")
+        )
         
     except Exception as e:
-        console.print(f"[bold red]Error during analysis:[/bold red] {str(e)}")
+        console.flush()         # Don't drop status lines queued before the failure
+        console.print(f"[bold red]Error during analysis:[/bold red] {escape(str(e))}")
+        
+def _gather_history_and_context(include_context: bool, context: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Read the command history and terminal context.
+    
+    Args:
+        include_context: Whether to read the recent command history
+        context: Terminal context gathered by the caller, if any. It is copied, since the history is added to it
         
-def build_debug_prompt(error_message: str, context: Dict[str, Any], auto_mode: bool = False) -> str:
+    Returns:
+        Tuple of the history data and terminal context
+    """
+    context = dict(context) if context is not None else get_terminal_context()
+    history_data = get_recent_commands_with_outputs() if include_context else {"commands": [], "has_outputs": False}
+    return history_data, context
+
+def _history_payload(history: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert the column-oriented history into the list of command dicts sent as the request's recent_commands"""
+    commands = []
+    for timestamp, command, exit_code, output in zip(history["timestamps"], history["commands"], history["exit_codes"], history["outputs"]):
+        cmd_entry = {"timestamp": timestamp, "command": command, "exit_code": exit_code}
+        if output:
+            cmd_entry["output"] = output
+        commands.append(cmd_entry)
+    return commands
+
+def _history_columns(commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a list of command dicts (the recent_commands payload format) into the column-oriented history"""
+    return {
+        "timestamps": [cmd.get("timestamp", "Unknown time") for cmd in commands],
+        "commands": [cmd["command"] for cmd in commands],
+        "exit_codes": [cmd.get("exit_code") for cmd in commands],
+        "outputs": [cmd.get("output", "") for cmd in commands],
+    }
+
+def build_debug_prompt(error_message: str, context: Dict[str, Any], auto_mode: bool = False,
+                       history: Optional[Dict[str, Any]] = None) -> str:
     """
     Build a detailed prompt for debugging based on available context.
     
     Args:
         error_message: The error message to analyze
-        context: Terminal context including command history if available
+        context: Terminal context, with any command history as a "recent_commands" list
         auto_mode: Whether this is an automatic analysis
+        history: Column-oriented history from get_recent_commands_with_outputs. If None, it is taken from context
         
     Returns:
         Prompt string for the AI
     """
     # Core prompt - adjust based on mode
-    if auto_mode:
-        prompt = """
-        I need you to analyze my recent terminal activity.
-        
-        Please:
-        1. Explain what these commands are doing
-        2. Identify any errors or inefficiencies
-        3. Suggest improvements or best practices
-        4. Provide educational context about the commands
-        
-        Format your response as markdown with clear sections.
-        """
-    else:
-        prompt = f"""
-        I received this error in my terminal: "{error_message}"
-        
-        Please explain:
-        1. What this error means
-        2. The most likely cause
-        3. How to fix it
-        4. How to prevent it in the future
-        
-        Format your response as markdown with clear sections.
-        """
+    header = _AUTO_HEADER if auto_mode else _ERROR_HEADER.format(err=error_message)
+    
+    # Fast path: without system information or history the prompt is just the header
+    if history is None and context.get("recent_commands"):
+        history = _history_columns(context["recent_commands"])
+    has_history = bool(history and history["commands"])
+    if not (context.get("os") or context.get("shell") or has_history):
+        return header
+    
+    parts: List[str] = [header]
     
     # Add system context
     if context.get("os") or context.get("shell"):
-        prompt += "\n\nSystem information:"
+        parts.append("\n\nSystem information:")
         if context.get("os"):
-            prompt += f"\n- Operating System: {context['os']}"
+            parts.append(f"\n- Operating System: {context['os']}")
         if context.get("shell"):
-            prompt += f"\n- Shell: {context['shell']}"
+            parts.append(f"\n- Shell: {context['shell']}")
         if context.get("current_dir"):
-            prompt += f"\n- Current Directory: {context['current_dir']}"
+            parts.append(f"\n- Current Directory: {context['current_dir']}")
     
     # Add command history if available
-    if "recent_commands" in context and context["recent_commands"]:
-        prompt += "\n\nRecent commands and their outputs:\n"
-        
-        for i, cmd in enumerate(context["recent_commands"]):
-            # Format the command line with additional info
-            cmd_line = f"{i+1}. [{cmd.get('timestamp', 'Unknown time')}] `{cmd['command']}`"
-            
-            # Add exit code indicator using words instead of symbols
-            if "exit_code" in cmd:
-                if cmd["exit_code"] == 0:
-                    status = "[SUCCESS]"
-                else:
-                    status = f"[FAILED] (exit code: {cmd['exit_code']})"
-                cmd_line += f" {status}"
-                
-            prompt += f"{cmd_line}\n"
-            
-            # Add output if available
-            if "output" in cmd and cmd["output"]:
-                # Limit output to prevent token overflow
-                output = cmd["output"]
-                if len(output) > 500:
-                    output = output[:500] + "... (truncated)"
-                prompt += f"   Output:\n   ```\n   {output}\n   ```\n"
+    if has_history:
+        parts.append("\n\nRecent commands and their outputs:\n")
+        parts.extend(
+            _format_history_entry(i, timestamp, command, exit_code, output)
+            for i, (timestamp, command, exit_code, output) in enumerate(
+                zip(history["timestamps"], history["commands"], history["exit_codes"], history["outputs"]), 1
+            )
+        )
         
         if auto_mode:
-            prompt += "\nPlease analyze these recent commands and their outputs, explaining what they're doing and identifying any issues."
+            parts.append("\nPlease analyze these recent commands and their outputs, explaining what they're doing and identifying any issues.")
         else:
-            prompt += "\nPlease analyze the error in the context of these recent commands and their outputs."
+            parts.append("\nPlease analyze the error in the context of these recent commands and their outputs.")
+    
+    return "".join(parts)
+
+def _format_history_entry(index: int, timestamp: str, command: str, exit_code: Optional[int], output: str) -> str:
+    """Format one command history entry for the debug prompt"""
+    # Add exit code indicator using words instead of symbols
+    if exit_code is None:
+        status = ""
+    elif exit_code == 0:
+        status = " [SUCCESS]"
+    else:
+        status = f" [FAILED] (exit code: {exit_code})"
+    entry = f"{index}. [{timestamp or 'Unknown time'}] `{command}`{status}\n"
     
-    return prompt
\ No newline at end of file
+    # Add output if available, limited to prevent token overflow
+    if output:
+        if len(output) > 500:
+            output = output[:500] + "... (truncated)"
+        entry += f"   Output:\n   ```\n   {output}\n   ```\n"
+    return entry
@@ -4,15 +4,63 @@ This handles the setup of command history logging for better debugging context.
 """
 
 import os
+import functools
+import hashlib
+import json
+import mmap
 import sys
 from pathlib import Path
 from typing import List, Optional
-from rich.console import Console
-from rich.prompt import Confirm
-from rich.panel import Panel
-from rich.markdown import Markdown
 
-console = Console()
+from ..core.context import get_recent_commands_with_outputs     # Re-exported for existing importers
+
+__all__ = ["handle_init_command", "get_recent_commands_with_outputs"]
+
+# TerminAI file locations, resolved once at import
+_HOME = Path.home()
+_TERMINAI_DIR = _HOME / ".terminai"
+_LOGGER_SH = _TERMINAI_DIR / "logger.sh"
+_LOGGER_HASH = _TERMINAI_DIR / ".logger.sh.hash"
+_RC_MTIMES = _TERMINAI_DIR / ".rc_mtimes.json"
+
+# Supported shell configuration files, in the order they are configured
+_SHELL_CONFIG_NAMES = (".bashrc", ".bash_profile", ".zshrc")
+
+_console = None
+
+def _get_console():
+    """Create the console on first use, so rich is only imported when output is needed"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+# Banner text for the init command
+_SETUP_MESSAGE = (
+    "[bold]TerminAI Initialization[/bold]\n\n"
+    "This will configure your shell to automatically log your recent commands and their exit codes.\n"
+    "- Commands are stored [bold]locally only[/bold] in your ~/.terminai directory\n"
+    "- Only the last 5 commands are kept\n"
+    "- Logs are [bold]never[/bold] sent anywhere unless you explicitly run [bold]debug --context[/bold]\n"
+    "- Command logging is optimized for minimal performance impact\n"
+    "- To debug with context: [bold]terminai debug --context \"your error message\"[/bold]"
+)
+
+_DONE_MESSAGE = (
+    "[green]TerminAI has been successfully initialized![/green]\n\n"
+    "To activate command history logging, please:\n"
+    "1. Restart your terminal OR\n"
+    "2. Run [bold]source ~/.bashrc[/bold] (or [bold]source ~/.zshrc[/bold])\n\n"
+    "You can now use [bold]terminai debug --context[/bold] for enhanced debugging."
+)
+
+@functools.lru_cache(maxsize=None)
+def _banner(message: str, title: str, border_style: str):
+    """Build a banner panel once, with its markup parsed up front, and reuse it on later calls"""
+    from rich.panel import Panel
+    from rich.text import Text
+    return Panel(Text.from_markup(message), title=title, border_style=border_style)
 
 def handle_init_command(force: bool = False) -> None:
     """
@@ -21,21 +69,14 @@ def handle_init_command(force: bool = False) -> None:
     Args:
         force: If True, will overwrite existing configuration
     """
+    from rich.prompt import Confirm
+    
+    console = _get_console()
     
-    console.print(Panel(
-        "[bold]TerminAI Initialization[/bold]\n\n"
-        "This will configure your shell to automatically log your recent commands and outputs.\n"
-        "- Commands and outputs are stored [bold]locally only[/bold] in your ~/.terminai directory\n"
-        "- Only the last 5 commands and their outputs are kept\n"
-        "- Logs are [bold]never[/bold] sent anywhere unless you explicitly run [bold]debug --context[/bold]\n"
-        "- Command logging is optimized for minimal performance impact\n"
-        "- To debug with context: [bold]terminai debug --context \"your error message\"[/bold]",
-        title="TerminAI Setup",
-        border_style="cyan"
-    ))
+    console.print(_banner(_SETUP_MESSAGE, "TerminAI Setup", "cyan"))
     
     # Checking for existing installation
-    terminai_dir = Path.home() / ".terminai"
+    terminai_dir = _TERMINAI_DIR
     if terminai_dir.exists() and not force:
         console.print("[yellow]TerminAI appears to be already initialized.[/yellow]")
         
@@ -65,15 +106,7 @@ def handle_init_command(force: bool = False) -> None:
     # Add logging commands to shell configuration files
     success = add_logging_to_shell_configs(shell_configs)
     if success:
-        console.print(Panel(
-            "[green]TerminAI has been successfully initialized![/green]\n\n"
-            "To activate command history logging, please:\n"
-            "1. Restart your terminal OR\n"
-            "2. Run [bold]source ~/.bashrc[/bold] (or [bold]source ~/.zshrc[/bold])\n\n"
-            "You can now use [bold]terminai debug --context[/bold] for enhanced debugging.",
-            title="Setup Complete",
-            border_style="green"
-        ))
+        console.print(_banner(_DONE_MESSAGE, "Setup Complete", "green"))
     else:
         console.print("[bold red]Initialization failed.[/bold red]")
 
@@ -84,23 +117,17 @@ def get_shell_config_files() -> List[Path]:
     Returns:
         List of paths to shell configuration files
     """
-    configs  = []
-    
-    # Check for bash configuration
-    bashrc = Path.home() / ".bashrc"
-    bash_profile = Path.home() / ".bash_profile"        # Alternative bash configurations on some systems
+    home = _HOME
     
-    if bashrc.exists():
-        configs.append(bashrc)
-    if bash_profile.exists():
-        configs.append(bash_profile)
-    
-    # Check for zsh configurations
-    zshrc = Path.home() / ".zshrc"
-    if zshrc.exists():
-        configs.append(zshrc)
+    # List the home directory once instead of stat-ing each candidate
+    try:
+        with os.scandir(home) as entries:
+            names = {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        return []
     
-    return configs
+    # Bash configurations (.bash_profile is used instead of .bashrc on some systems), then zsh
+    return [home / name for name in _SHELL_CONFIG_NAMES if name in names]
 
 # Helper function
 def add_logging_to_shell_configs(config_files: List[Path]) -> bool:
@@ -117,219 +144,95 @@ def add_logging_to_shell_configs(config_files: List[Path]) -> bool:
         # Create the logging script content
         logging_script = create_logging_script()
         
-        # Writing the logging script to the .terminai directory
-        logging_script_path = Path.home() / ".terminai" / "logger.sh"
-        with open(logging_script_path, 'w') as f:
-            f.write(logging_script)
-            
-        # Make it executable
-        os.chmod(logging_script_path, 0o755) # Modifying file permissions. 0o755 is octal for read+write+execute for owner, read+execute for others
+        # Writing the logging script to the .terminai directory, unless an identical copy is already installed
+        logging_script_path = _LOGGER_SH
+        script_hash = hashlib.blake2b(logging_script.encode(), digest_size=8).hexdigest()
+        if not (logging_script_path.exists() and _read_text_or_none(_LOGGER_HASH) == script_hash):
+            with open(logging_script_path, 'w') as f:
+                f.write(logging_script)
+                
+            # Make it executable
+            os.chmod(logging_script_path, 0o755) # Modifying file permissions. 0o755 is octal for read+write+execute for owner, read+execute for others
+            _LOGGER_HASH.write_text(script_hash)
+        
+        # Config files unchanged since they were last confirmed as configured don't need to be read again
+        try:
+            rc_mtimes = json.loads(_read_text_or_none(_RC_MTIMES) or "{}")
+        except ValueError:
+            rc_mtimes = {}
         
-        # Add source commands to each config file
+        # Add source commands to each config file, reporting all results in one print
+        status_lines = []
         for config_file in config_files:
-            add_source_command(config_file, logging_script_path)
+            key = str(config_file)
+            if rc_mtimes.get(key) == config_file.stat().st_mtime_ns:
+                status = "exists"
+            else:
+                status = add_source_command(config_file, logging_script_path)
+                rc_mtimes[key] = config_file.stat().st_mtime_ns
+            
+            if status == "added":
+                status_lines.append(f"[green]Added logging to {config_file}[/green]")
+            else:
+                status_lines.append(f"[yellow]Logging already configured in {config_file}[/yellow]")
+        if status_lines:
+            _get_console().print("\n".join(status_lines))
+        
+        _RC_MTIMES.write_text(json.dumps(rc_mtimes))
         
         return True
     except Exception as e:
-        console.print(f"[bold red]Error setting up logging:[/bold red] {str(e)}")
+        _get_console().print(f"[bold red]Error setting up logging:[/bold red] {str(e)}")
         return False
     
+def _read_text_or_none(path: Path) -> Optional[str]:
+    """Read a small state file, returning None if it doesn't exist or can't be read"""
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+    
 def create_logging_script() -> str:
     """
-    Create a shell script that automatically logs recent commands and their outputs.
-    Optimized for minimal performance impact while providing rich debugging context.
+    Load the shell script that automatically logs recent commands and their exit codes.
+    The script ships as package data (terminai/data/logger.sh) and is only read when init runs.
     
     Returns:
         Shell script content as a string
     """
+    try:
+        from importlib.resources import files
+    except ImportError:     # Python 3.8
+        from importlib.resources import read_text
+        return read_text("terminai.data", "logger.sh")
     
-    return """
-    #!/bin/bash
-    # TerminAI Command and Output Logger
-    # Automatically logs last 5 commands and their outputs with minimal performance impact
-    
-    # Create log directory if it does't exist 
-    mkdir -p ~/.terminai
-    
-    # Function to log commands with its output
-    terminai_log_command_output() {
-        # Get command and exit code
-        local exit_code=$?
-        local cmd="$(history 1 | sed 's/^[ ]*[0-9]*[ ]*//')"
-        local timestamp=$(date '+%Y-%m-%d %H:%M:%S')
-        
-        # Don't log terminai commands to avoid noise 
-        if [[ $cmd != terminai* ]]; then 
-            # Create a unique ID for this command to link the command with the output
-            local cmd_id=$(date +%s%N)
-            # Write command with metadata 
-            echo "${timestamp}|${exit_code}|${cmd_id}|${cmd}" >> ~/.terminai/commands.log
-        
-            # Rotate commands log to keep only last 5
-            tail -n 5 ~/.terminai/commands.log > ~/.terminai/commands.log.tmp
-            mv ~/.terminai/commands.log.tmp ~/.terminai/commands.log
-        
-            # Capture output from screen buffer if possible (non-blocking)
-            # Different approach based on shell
-            if [ -n "$BASH_VERSION" ]; then
-                # For Bash: Try to get output from screen buffer or command
-                if [ -n "$TERM_OUTPUT" ]; then
-                    # Limit output size to prevent massive files, saving last 50 lines
-                    echo "$TERM_OUTPUT" | tail -n 50 > ~/.terminai/output_${cmd_id}.log
-                    # Reset terminal output for next command
-                    unset TERM_OUTPUT
-                fi
-            elif [ -n "$ZSH_VERSION" ]; then
-                # For Zsh: Similar approach
-                if [ -n "$TERM_OUTPUT" ]; then
-                    echo "$TERM_OUTPUT" | tail -n 50 > ~/.terminai/output_${cmd_id}.log
-                    unset TERM_OUTPUT
-                fi
-            fi
-
-            
-            # Clean up old output files (keep only for the commands in commands.log)
-            # This ensures we only store outputs for the most recent 5 commands
-            for output_file in ~/.terminai/output_*.log; do
-                if [ -f "$output_file" ]; then
-                    file_id=$(basename "$output_file" | sed 's/output_\(.*\)\.log/\1/')
-                    if ! grep -q "|$file_id|" ~/.terminai/commands.log; then
-                        rm "$output_file"
-                    fi
-                fi
-            done
-        fi
-    }
-    
-    # Function to capture output before showing the prompt
-    terminai_capture_output() {
-        # For non-terminai commands, try to capture output
-        local cmd="$(history 1 | sed 's/^[ ]*[0-9]*[ ]*//')"
-        if [[ $cmd != terminai* ]] && [[ -n "$cmd" ]]; then
-            # Capture terminal output using screen tricks
-            # This is a non-blocking approach that works in most terminals
-            export TERM_OUTPUT=$(echo -e "\033[J\033[0;0H\033[6n" > /dev/tty; read -t 0.1 -s -d R pos; echo "$pos" | cut -d';' -f2-)
-        fi
-    }
-    
-    # Set up shell-specific hooks (optimized for performance)
-    if [ -n "$BASH_VERSION" ]; then
-        # For Bash
-        # Store original PROMPT_COMMAND
-        if [ -z "$ORIGINAL_PROMPT_COMMAND" ]; then
-            ORIGINAL_PROMPT_COMMAND="$PROMPT_COMMAND"
-        fi
-        
-        # Use PROMPT_COMMAND for both capturing and logging
-        # This runs just before the prompt is displayed
-        PROMPT_COMMAND='terminai_capture_output; terminai_log_command_output;'${ORIGINAL_PROMPT_COMMAND:+$ORIGINAL_PROMPT_COMMAND}
-    elif [ -n "$ZSH_VERSION" ]; then
-        # For Zsh
-        # preexec runs before command execution
-        preexec() {
-            # Nothing needed here, we'll capture after command completes
-        }
-        
-        # precmd runs after command completes, before prompt display
-        precmd() {
-            terminai_capture_output
-            terminai_log_command_output
-        }
-    fi
+    return files("terminai.data").joinpath("logger.sh").read_text()
 
-    # Print initialization message only once per session
-    if [ -z "$TERMINAI_INITIALIZED" ]; then
-        export TERMINAI_INITIALIZED=1
-        echo "TerminAI command logging initialized (automatically capturing last 5 commands)."
-    fi
-    """
-
-def add_source_command(config_file: Path, script_path: Path) -> None:
+def add_source_command(config_file: Path, script_path: Path) -> str:
     """
     Add a source command to a shell configuration file.
     
     Args:
         config_file: Path to the shell configuration file
         script_path: Path to the logging script
+        
+    Returns:
+        "added" if the source command was appended, "exists" if it was already present
     """
     source_command = f"\n# Added by TerminAI\n[ -f {script_path} ] && source {script_path}\n"
     
-    # Check if the source command is already in the file
-    with open(config_file, 'r') as f:
-        content = f.read()
+    # Check for the source command with a read-only open, so already configured read-only files still work
+    with open(config_file, 'rb') as f:
+        # Scan via mmap so the file isn't read into memory (empty files can't be mapped)
+        configured = False
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                configured = mapped.find(str(script_path).encode()) != -1
     
-    if str(script_path) not in content:
+    if not configured:
         # Append the source command to the file
-        with open(config_file, 'a') as f:
-            f.write(source_command)
-        console.print(f"[green]Added logging to {config_file}[/green]")
-    else:
-        console.print(f"[yellow]Logging already configured in {config_file}[/yellow]")
-        
-def get_recent_commands_with_outputs(limit: int = 5) -> Dict[str, Any]:
-    """
-    Get recent commands and their outputs from the automatic logging system.
-    Optimized for fast retrieval of exactly what's needed.
+        with open(config_file, 'ab') as f:
+            f.write(source_command.encode())
     
-    Args:
-        limit: Maximum number of commands to retrieve (default: 5)
+    return "exists" if configured else "added"
         
-    Returns:
-        Dict with recent commands and their outputs
-    """
-    result = {
-        "commands": [],
-        "has_outputs": False
-    }
-    
-    try:
-        # Get commands from the commands log
-        cmd_log_path = Path.home() / ".terminai" / "commands.log"
-        if cmd_log_path.exists():
-            with open(cmd_log_path, 'r') as f:
-                lines = f.readlines()
-            
-            # Parse the command entries. Format: timestamp|exit_code|cmd_id|command
-            commands = []
-            for line in lines:
-                line = line.strip()
-                if line: 
-                    parts = line.split('|', 3)
-                    if len(parts) >= 4:
-                        timestamp, exit_code, cmd_id, command = parts
-                        commands.append({
-                            "timestamp": timestamp,
-                            "exit_code": int(exit_code),
-                            "cmd_id": cmd_id,
-                            "command": command
-                        })
-            
-            # Process commands (most recent first)
-            for cmd in reversed(commands[:limit]):
-                cmd_entry = {
-                    "timestamp": cmd["timestamp"],
-                    "command": cmd["command"],
-                    "exit_code": cmd["exit_code"]
-                }
-                
-                # Look for corresponding output file 
-                output_file = Path.home() / ".terminai" / f"output_{cmd['cmd_id']}.log"
-                if output_file.exists():
-                    try:
-                        with open(output_file, 'r') as f:
-                            output_text = f.read()
-                        
-                        if output_text.strip():
-                            cmd_entry["output"] = output_text.strip()
-                            result["has_outputs"] = True
-                    except Exception as e:
-                        # If we can't read the output, just continue without it
-                        pass
-                
-                result["commands"].append(cmd_entry)
-        return result
-    
-    except Exception as e:
-        console.print(f"[yellow]Error reading command history: {str(e)}[/yellow]")
-        return result
-                        
\ No newline at end of file
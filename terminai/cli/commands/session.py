@@ -0,0 +1,99 @@
+"""
+Implementation of the 'session' command for TerminAI.
+This runs an interactive prompt that gathers the terminal context once and reuses it for every query.
+"""
+
+import shlex
+from typing import Any, Dict, List
+
+from .ask import handle_ask_command
+from .debug import handle_debug_command
+from ..core.context import get_terminal_context
+
+__all__ = ["handle_session_command"]
+
+_PROMPT = "terminai> "
+
+_HELP_TEXT = (
+    "[bold]TerminAI session[/bold]\n"
+    "- [bold]ask <query>[/bold] (or just type the query) to get a command suggestion\n"
+    "- [bold]debug [-c] [-a] [\"error message\"][/bold] to analyze an error or recent activity\n"
+    "- [bold]exit[/bold] to leave the session"
+)
+
+_console = None
+
+def _get_console():
+    """Create the console on first use, so rich is only imported when a handler runs"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+def handle_session_command() -> None:
+    """Run an interactive session, dispatching each line to the ask or debug handler with a shared context"""
+    console = _get_console()
+    console.print(_HELP_TEXT)
+    
+    # Gathered once, then reused by every query in the session
+    context = get_terminal_context()
+    
+    while True:
+        try:
+            line = input(_PROMPT).strip()
+        except (EOFError, KeyboardInterrupt):
+            console.print()
+            break
+        
+        if not line:
+            continue
+        if line in ("exit", "quit"):
+            break
+        
+        try:
+            _dispatch(line, context)
+        except KeyboardInterrupt:
+            console.print("\n[yellow]Interrupted.[/yellow]")    # Cancel the current query, not the session
+
+def _dispatch(line: str, context: Dict[str, Any]) -> None:
+    """
+    Run a single session line.
+    
+    Args:
+        line: The line entered by the user
+        context: Terminal context shared by the session
+    """
+    command, _, rest = line.partition(" ")
+    rest = rest.strip()
+    
+    if command == "debug":
+        try:
+            args = shlex.split(rest)
+        except ValueError as e:
+            _get_console().print(f"[bold red]Could not parse arguments:[/bold red] {e}")
+            return
+        _run_debug(args, context)
+    elif command == "ask":
+        if rest:
+            handle_ask_command(rest, context)
+        else:
+            _get_console().print("[yellow]Usage: ask <query>[/yellow]")
+    else:
+        handle_ask_command(line, context)   # Anything else is treated as a question
+
+def _run_debug(args: List[str], context: Dict[str, Any]) -> None:
+    """Call the debug handler with the same flags as 'terminai debug'"""
+    include_context = False
+    auto = False
+    message_parts = []
+    for arg in args:
+        if arg in ("-c", "--context"):
+            include_context = True
+        elif arg in ("-a", "--auto"):
+            auto = True
+        else:
+            message_parts.append(arg)
+    
+    error_message = " ".join(message_parts) or None
+    handle_debug_command(error_message, include_context or auto, auto_analyse=auto, context=context)
@@ -4,21 +4,33 @@ This handles interactions with AI models to generate responses for user queries.
 """
 
 import os 
-import dotenv
-import requests # To enable HTTP requests to APIs
-from typing import Dict, Any, Optional 
+import json
+from typing import Callable, Dict, Any, Iterator, Optional 
 import logging
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())    # Logging is left to the application (see the CLI's --verbose flag)
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
 env_path = os.path.join(project_root, ".env")
 
+# Provider built by get_ai_provider, reused for the rest of the process
+_PROVIDER_SINGLETON = None
+
+# (connect, read) timeouts in seconds. Local models can take a while before sending the first token
+_REQUEST_TIMEOUT = (3, 120)
+
+def _create_session():
+    """Create an HTTP session whose keep-alive connection pool is reused across a provider's requests"""
+    import requests     # To enable HTTP requests to APIs (imported on first use to keep CLI startup fast)
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class AIProvider:
     """Base class for AI providers"""
@@ -27,72 +39,96 @@ class AIProvider:
         """Generate a response based on the prompt and context"""
         raise NotImplementedError("Subclasses must implement this method")
     
+    def stream_response(self, prompt: str, context: Dict[str, Any] = None) -> Iterator[str]:
+        """Yield the response in chunks as they arrive. Providers without streaming support yield it whole"""
+        yield self.generate_response(prompt, context)
+    
 class OllamaProvider(AIProvider):
     """Integration with Ollama for local AI inference"""
     
+    # Base prompt
+    _SYSTEM_PROMPT = """
+        You are TerminAI, an AI assistant specialized in terminal commands and operations.
+        Provide clear, concise, and accurate responses to user queries.
+        For command suggestions, only output the exact command the user should run.
+        For explanations, be thorough but focus on practical usage.
+        """
+    
+    # Context keys included in the prompt, with their labels
+    _CONTEXT_FIELDS = (
+        ("os", "Operating System"),
+        ("shell", "Shell"),
+        ("current_dir", "Current Directory"),
+    )
+    
+    _PROMPT_TEMPLATE = "{system}\n\n{context}\nUser Query: {query}\n\nResponse:"
+    
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3"):
         self.base_url = base_url
         self.model = model
-        logger.info(f"Initialized Ollama provider with model: {model}")
+        self._generate_url = f"{base_url}/api/generate"
+        self._session = _create_session()
     
-    def generate_response(self, prompt: str, context: Dict[str, Any] = None) -> str:
-        """Generate a response using Ollama""" 
-        try: 
-            # Construct the full prompt with context   
-            full_prompt = self._build_prompt(prompt, context)
+    def generate_response(self, prompt: str, context: Dict[str, Any] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate a response using Ollama. The reply is streamed, so tokens can be shown as they arrive.
+        
+        Args:
+            prompt: The user's query
+            context: Context information about the terminal environment
+            on_token: Optional callback invoked with each chunk of text as it is received
             
-            # Call Ollama API
-            response = requests.post(f"{self.base_url}/api/generate", json={"model": self.model, "prompt": full_prompt, "stream": False})
+        Returns:
+            str: The full generated response
+        """
+        parts = []
+        for chunk in self.stream_response(prompt, context):
+            if on_token:
+                on_token(chunk)
+            parts.append(chunk)
+        return "".join(parts)
+    
+    def stream_response(self, prompt: str, context: Dict[str, Any] = None) -> Iterator[str]:
+        """Stream a response from Ollama, yielding tokens as the model produces them"""
+        try:
+            full_prompt = self._build_prompt(prompt, context)
             
-            if response.status_code != 200:
-                logger.error(f"Ollama API error: {response.status_code} - {response.text}")
-                return f"Error: Failed to get response from AI model (HTTP {response.status_code})"
-
-            # Trying to parse the response safely
-            try:
-                # Extract just the response text from the JSON
-                return response.json().get("response", "No response received")
-            except ValueError as json_err:
-                # If JSON parsing fails, try to extract the text directly
-                logger.warning(f"JSON parsing error: {json_err}. Trying alternative parsing.")
-                # Try an alternative approach for the Ollama API in case it is using a newer Ollama API format
-                try:
-                    if "message" in response.json():
-                        return response.json().get("message", {}).get("content", "No response content")
-                    # Simple fallback - just return the text
-                    return response.text.strip()
-                except:
-                    # Last resort - return raw text if all parsing attempts fail
-                    return response.text.strip()
+            # Ollama streams newline-delimited JSON objects, one per generated chunk
+            with self._session.post(self._generate_url, json={"model": self.model, "prompt": full_prompt, "stream": True}, stream=True, timeout=_REQUEST_TIMEOUT) as response:
+                if response.status_code != 200:
+                    logger.error(f"Ollama API error: {response.status_code} - {response.text}")
+                    yield f"Error: Failed to get response from AI model (HTTP {response.status_code})"
+                    return
+                
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError as json_err:
+                        logger.warning(f"Skipping malformed stream chunk: {json_err}")
+                        continue
+                    
+                    # Newer Ollama API formats nest the text under "message"
+                    chunk = data.get("response") or data.get("message", {}).get("content", "")
+                    if chunk:
+                        yield chunk
+                    if data.get("done"):
+                        break
         except Exception as e:
-            logger.error(f"Error generating AI response: {str(e)}")
-            return f"Error: {str(e)}"
+            logger.error(f"Error streaming AI response: {str(e)}")
+            yield f"Error: {str(e)}"
     
     def _build_prompt(self, prompt: str, context: Dict[str, Any] = None) -> str:
         """Build a comprehensive prompt with context for better responses"""
         if not context:
             context = {}
         
-        # Base prompt
-        system_prompt = """
-        You are TerminAI, an AI assistant specialized in terminal commands and operations.
-        Provide clear, concise, and accurate responses to user queries.
-        For command suggestions, only output the exact command the user should run.
-        For explanations, be thorough but focus on practical usage.
-        """
-        
         # Add user context if available 
-        context_prompt = ""
-        if context.get("os"):
-            context_prompt += f"Operating System: {context['os']}\n"
-        if context.get("shell"):
-            context_prompt += f"Shell: {context['shell']}\n"
-        if context.get("current_dir"):
-            context_prompt += f"Current Directory: {context['current_dir']}\n"
+        context_prompt = "".join([f"{label}: {context[key]}\n" for key, label in self._CONTEXT_FIELDS if context.get(key)])
         
         # Combine all parts
-        full_prompt = f"{system_prompt}\n\n{context_prompt}\nUser Query: {prompt}\n\nResponse:"
-        return full_prompt
+        return self._PROMPT_TEMPLATE.format(system=self._SYSTEM_PROMPT, context=context_prompt, query=prompt)
 
 class APIProvider(AIProvider):
     """Integration with our secure backend API"""
@@ -117,7 +153,7 @@ class APIProvider(AIProvider):
         if self.api_url.endswith('/'):
             self.api_url = self.api_url[:-1]
         
-        logger.info(f"Initialized API provider with URL: {self.api_url}")
+        self._session = _create_session()
     
     def generate_response(self, prompt: str, context: Dict[str, Any] = None, command_type: str = "ask") -> str:
         """
@@ -131,7 +167,6 @@ class APIProvider(AIProvider):
         Returns:
             str: The generated response
         """
-        
         try: 
             if not context:
                 context = {}
@@ -152,10 +187,11 @@ class APIProvider(AIProvider):
             }
             
             # Calling our backend API
-            response = requests.post(
-                f"{self.api_url}/{endpoint}",
+            response = self._session.post(
+                f"{self.api_url}{endpoint}",
                 json=data,
-                headers=header
+                headers=header,
+                timeout=_REQUEST_TIMEOUT
             )
             
             # Checking response
@@ -163,9 +199,9 @@ class APIProvider(AIProvider):
                 logger.error(f"API error: {response.status_code} - {response.text}")
                 return f"Error: Failed to get response from API (HTTP {response.status_code})"
             
-            # Extract the command from the response 
+            # Extract the command from the response, parsing the raw body once
             try: 
-                result = response.json()
+                result = json.loads(response.content)
                 return result.get("command", "No command recieved")
             except ValueError as json_err:
                 logger.error(f"JSON parsing error: {json_err}")
@@ -174,17 +210,44 @@ class APIProvider(AIProvider):
         except Exception as e:
             logger.error(f"Error generating AI response: {str(e)}")
             return f"Error: {str(e)}"
+    
+    def stream_response(self, prompt: str, context: Dict[str, Any] = None, command_type: str = "ask") -> Iterator[str]:
+        """The backend API returns complete responses, so this yields a single chunk"""
+        yield self.generate_response(prompt, context, command_type)
         
 
+def _load_env_file(path: str) -> None:
+    """
+    Load KEY=VALUE lines from a .env file into the environment.
+    Variables already set in the environment take precedence over the file.
+    
+    Args:
+        path: Path to the .env file
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[len("export "):]
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            os.environ.setdefault(key.strip(), value.strip().strip("\"'"))
+
 # Factory function for AI providers
 def get_ai_provider() -> AIProvider:
-    """Factory function to get the configured AI provider"""
+    """Factory function to get the configured AI provider, built once per process"""
+    global _PROVIDER_SINGLETON
+    if _PROVIDER_SINGLETON is not None:
+        return _PROVIDER_SINGLETON
     
     # Load environment variables from .env file (if it exists)
     if os.path.exists(env_path):
-        dotenv.load_dotenv(env_path, override=True)
-    else:
-        print(f"Warning: .env file not found at {env_path}")
+        _load_env_file(env_path)
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f".env file not found at {env_path}")
         
     # Get provider type from environment variable
     provider_type = os.environ.get("TERMINAI_PROVIDER", "api")
@@ -192,14 +255,15 @@ def get_ai_provider() -> AIProvider:
     if provider_type.lower() == "ollama":
         base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
         model = os.environ.get("OLLAMA_MODEL", "llama3")
-        return OllamaProvider(base_url=base_url, model=model)
+        _PROVIDER_SINGLETON = OllamaProvider(base_url=base_url, model=model)
     elif provider_type.lower() == "api":
         api_url = os.environ.get("TERMINAI_API_URL", "http://localhost:8000")
         api_key = os.environ.get("TERMINAI_API_KEY")
-        return APIProvider(api_url=api_url, api_key=api_key)
+        _PROVIDER_SINGLETON = APIProvider(api_url=api_url, api_key=api_key)
     else:
         logger.error(f"Unsupported AI provider: {provider_type}")
         raise ValueError(f"Unsupported AI provider: {provider_type}")
+    return _PROVIDER_SINGLETON
 
 # Convenience function for generating responses
 def generate_ai_response(prompt: str, context: Dict[str, Any] = None, command_type: str = "ask") -> str:
@@ -211,4 +275,14 @@ def generate_ai_response(prompt: str, context: Dict[str, Any] = None, command_ty
         return provider.generate_response(prompt, context, command_type)
     else:
         # For other providers like Ollama, just use the standard method
-        return provider.generate_response(prompt, context)
\ No newline at end of file
+        return provider.generate_response(prompt, context)
+
+# Streaming counterpart of generate_ai_response
+def generate_ai_response_stream(prompt: str, context: Dict[str, Any] = None, command_type: str = "ask") -> Iterator[str]:
+    """Yield an AI response for the given prompt and context in chunks as they arrive"""
+    provider = get_ai_provider()
+    
+    if isinstance(provider, APIProvider):
+        yield from provider.stream_response(prompt, context, command_type)
+    else:
+        yield from provider.stream_response(prompt, context)
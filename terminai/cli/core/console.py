@@ -0,0 +1,154 @@
+"""
+Console module for TerminAI.
+This provides a Rich console that batches status lines so each logical section is rendered with a single print call,
+plus helpers for rendering AI responses live as they stream in.
+"""
+
+from contextlib import contextmanager
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from rich.console import Console, Group, RenderableType
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.text import Text
+
+# Blocks longer than this are shown as plain text, since Markdown rendering stalls on large inputs
+MAX_MARKDOWN_LENGTH = 8192
+
+
+class BufferedConsole(Console):
+    """Rich console that collects markup lines and renders them together on flush"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buf: List[str] = []
+
+    def write(self, text: str) -> None:
+        """Queue a line of markup to be printed on the next flush"""
+        self._buf.append(text)
+
+    def flush(self) -> None:
+        """Print all queued lines with a single Rich print call"""
+        if not self._buf:
+            return
+        text = "\n".join(self._buf)
+        self._buf.clear()
+        super().print(text)
+
+
+@contextmanager
+def _live(console: Console, render: Callable[[], RenderableType]) -> Iterator[Live]:
+    """
+    Show a streaming response in a Live display, then print its final render once.
+    The display is transient and cropped to the terminal height, since Live re-prints the whole renderable on every
+    refresh once it outgrows the screen, leaving a copy of each frame in the scrollback.
+
+    Args:
+        console: Console to render to
+        render: Function returning the current renderable
+    """
+    try:
+        with Live(render(), console=console, refresh_per_second=10, transient=True, vertical_overflow="ellipsis") as live:
+            try:
+                yield live
+            finally:
+                live.update(Text())     # Live renders uncropped on exit, so clear it before it closes
+    finally:
+        console.print(render())     # Also keeps a partial response on screen when interrupted
+
+
+def _prime(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Pull the first chunk before rendering starts, so errors raised while setting up the response
+    (e.g. a missing API key) surface before Live takes over the screen.
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    return chunks if first is None else chain((first,), chunks)
+
+
+def _render_block(block: str) -> RenderableType:
+    """Render a Markdown block, falling back to plain text for oversized blocks"""
+    return Text(block) if len(block) > MAX_MARKDOWN_LENGTH else Markdown(block)
+
+
+def _split_blocks(text: str) -> Tuple[List[str], str]:
+    """
+    Split completed paragraphs off the front of streamed Markdown text.
+    A blank line only ends a block when it falls outside a fenced code block.
+
+    Args:
+        text: Markdown text received so far that has not been split yet
+
+    Returns:
+        Tuple of the completed blocks and the unfinished trailing text
+    """
+    blocks = []
+    start = 0
+    search = 0
+    while True:
+        idx = text.find("\n\n", search)
+        if idx == -1:
+            break
+        block = text[start:idx]
+        if block.count("```") % 2 == 0:
+            if block.strip():
+                blocks.append(block)
+            start = idx + 2
+        search = idx + 2
+    return blocks, text[start:]
+
+
+def stream_markdown(console: Console, chunks: Iterable[str], wrap: Optional[Callable[[RenderableType], RenderableType]] = None) -> str:
+    """
+    Render a streamed Markdown response live.
+    Completed paragraphs are parsed once and cached; only the unfinished trailing block is re-parsed per chunk.
+
+    Args:
+        console: Console to render to
+        chunks: Iterable of response text chunks
+        wrap: Optional function wrapping the rendered body (e.g. in a Panel)
+
+    Returns:
+        The full response text
+    """
+    stable: List[RenderableType] = []
+    parts: List[str] = []
+    trailing = ""
+
+    def build() -> RenderableType:
+        body = Group(*stable, _render_block(trailing))
+        return wrap(body) if wrap else body
+
+    chunks = _prime(chunks)
+    with _live(console, build) as live:
+        for chunk in chunks:
+            parts.append(chunk)
+            blocks, trailing = _split_blocks(trailing + chunk)
+            for block in blocks:
+                stable.append(_render_block(block))
+                stable.append(Text())       # Blank line between blocks, as a single Markdown render would have
+            live.update(build())
+
+    return "".join(parts)
+
+
+def stream_text(console: Console, chunks: Iterable[str], style: str = "") -> str:
+    """
+    Render a streamed plain-text response live.
+
+    Args:
+        console: Console to render to
+        chunks: Iterable of response text chunks
+        style: Rich style applied to the text
+
+    Returns:
+        The full response text
+    """
+    chunks = _prime(chunks)
+    text = Text(style=style)
+    with _live(console, lambda: text):
+        for chunk in chunks:
+            text.append(chunk)
+    return text.plain
@@ -4,107 +4,229 @@ This gathers information about the terminal environment to provide context for A
 """
 
 import os
-import platform     # For getting system information
-import subprocess   # For running terminal commands to gather information
-import logging
-from typing import Dict, Any
+import functools
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-logger = logging.getLogger(__name__)
+# TerminAI log locations, resolved once at import
+_TERMINAI_DIR = Path.home() / ".terminai"
+_CMDS_LOG = _TERMINAI_DIR / "commands.log"
+_OUTPUT_DIR = _TERMINAI_DIR
+
+# Commands log entry format: timestamp|exit_code|cmd_id|command
+_LOG_ENTRY = re.compile(rb'^([^|]+)\|(-?\d+)\|(\d+)\|(.*)$')
+_LOG_TAIL_BYTES = 4096      # Enough for the handful of entries kept in the log
+
+# Shell and user don't change within a process, so they are read from the environment once
+_SHELL = os.environ.get("SHELL", "Unknown")     # Checking environment variable, else fallback to "Unknown"
+_USER = os.environ.get("USER", "Unknown")
 
 def get_os_info() -> str:
     """Get the operating system information"""
+    return _os_info()
+
+@functools.lru_cache(maxsize=1)
+def _os_info() -> str:
+    """Look up the OS name and release once; the platform module's accessors don't cache their results"""
+    # Same result as platform.system()/platform.release() on POSIX, from a single uname call
+    if hasattr(os, "uname"):
+        uname = os.uname()
+        return f"{uname.sysname} {uname.release}"
+    
+    import platform     # Only platforms without uname (Windows) need the platform module's lookups
     return f"{platform.system()} {platform.release()}"
 
 def get_shell() -> str:
     """Get the current shell"""
-    return os.environ.get("SHELL", "Unknown")   # Checking environment variable, else fallback to "Unknown"
+    return _SHELL
 
 def get_current_directory() -> str:
-    """Get the current working directory"""
-    return os.getcwd()
+    """Get the current working directory, preferring the shell's $PWD (which keeps symlinked paths) when it is current"""
+    # $PWD is inherited, so it is stale in processes started with another cwd (IDEs, make -C, subprocess cwd=)
+    pwd = os.environ.get("PWD")
+    if pwd and os.path.isabs(pwd):
+        try:
+            if os.path.samefile(pwd, "."):
+                return pwd
+        except OSError:
+            pass
+    
+    try:
+        return os.getcwd()
+    except OSError:     # The working directory was deleted
+        return "Unknown"
+
+@dataclass(frozen=True)
+class _StaticContext:
+    """Fields of the terminal context that stay the same for the whole process"""
+    __slots__ = ("os", "shell", "username")     # Spelled out, since dataclass(slots=True) needs Python 3.10
+    os: str
+    shell: str
+    username: str
+
+@functools.lru_cache(maxsize=1)
+def _static_context() -> _StaticContext:
+    """OS, shell and user don't change within a process, so they are read once, on first use"""
+    return _StaticContext(get_os_info(), get_shell(), _USER)
+
+# Extra context probes (e.g. git branch), each returning a (key, value) pair. Run concurrently by _run_probes
+_CONTEXT_PROBES: Tuple[Callable[[], Tuple[str, Any]], ...] = ()
+_PROBE_TIMEOUT = 0.5       # Seconds to wait for the probes before leaving out the ones still running
+
+def _run_probes(probes: List[Callable[[], Tuple[str, Any]]], timeout: float = _PROBE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Run context probes in parallel, so slow probes don't stack their latencies.
+    A probe still running at the deadline is abandoned, not stopped, so probes that start subprocesses should
+    still pass their own timeout (e.g. subprocess.run(..., timeout=...)).
+    
+    Args:
+        probes: Callables returning a (key, value) pair for the context
+        timeout: Seconds to wait for all probes to finish
+        
+    Returns:
+        Dictionary of the results from probes that finished in time without raising
+    """
+    import threading
+    import time
+    
+    finished: List[Optional[Tuple[str, Any]]] = [None] * len(probes)
+    
+    def run(index: int, probe: Callable[[], Tuple[str, Any]]) -> None:
+        try:
+            finished[index] = probe()
+        except Exception:
+            pass        # A failed probe just leaves its field out
+    
+    # Daemon threads, so a probe that overruns the deadline doesn't hold up interpreter exit
+    threads = [threading.Thread(target=run, args=(i, probe), daemon=True) for i, probe in enumerate(probes)]
+    for thread in threads:
+        thread.start()
+    
+    deadline = time.monotonic() + timeout        # One shared deadline, so total wait doesn't grow with the probe count
+    results = {}
+    for index, thread in enumerate(threads):
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive() or finished[index] is None:
+            continue        # A slow probe is left running and its field left out
+        key, value = finished[index]
+        results[key] = value
+    return results
 
 # Main context function
 def get_terminal_context() -> Dict[str, Any]:
     """
     Get basic information about the terminal environment.
+    The static fields are gathered once per process; the current directory is refreshed on every call,
+    and callers get their own dict so they can extend it.
     
     Returns:
         Dictionary with OS, shell, and current directory information
     """
-    try:
-        context = {
-            "os" : get_os_info(),
-            "shell" : get_shell(),
-            "current_dir" : get_current_directory(),
-            "username" : os.environ.get("USER", "Unknown")
-        }
-        return context
-    
-    except Exception as e:
-        logger.error(f"Error getting terminal context: {e}")
-        return { "error" : f"Failed to get context information: {str(e)}"}
+    static = _static_context()
+    context = {
+        "os" : static.os,
+        "shell" : static.shell,
+        "current_dir" : get_current_directory(),
+        "username" : static.username
+    }
+    if _CONTEXT_PROBES:
+        context.update(_run_probes(list(_CONTEXT_PROBES)))
+    return context
 
-def get_recent_commands_with_outputs() -> Dict[str, Any]:
+def read_log_tail(log_path: Path, limit: int) -> List[Tuple[str, int, str, str]]:
     """
-    Get recent commands and their outputs from the TerminAI logs.
+    Parse the last entries of the commands log, reading only the end of the file where possible.
     
+    Args:
+        log_path: Path to the commands log
+        limit: Maximum number of entries to return
+        
     Returns:
-        Dictionary with commands list and has_outputs flag
-    """    
-    commands = []
-    has_outputs = False
-    
-    # Path to command log
-    log_path = os.path.expanduser("~/.terminai/commands.log")
-    
-    # Check if log file exists
-    if not os.path.exists(log_path):
-        return {"commands": commands, "has_outputs": has_outputs}
-    
+        List of (timestamp, exit_code, cmd_id, command) tuples, oldest first
+    """
     try:
-        # Read the command log file
-        with open(log_path, 'r') as f:
-            lines = f.readlines()
-        
-        # Process each line (format: timestamp|exit_code|cmd_id|command)
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        with open(log_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = max(0, size - _LOG_TAIL_BYTES)
+            while True:
+                f.seek(offset)
+                lines = f.read().split(b'\n')
+                if offset:
+                    lines = lines[1:]       # The first line may start mid-entry
+                
+                entries = []
+                for line in reversed(lines):
+                    match = _LOG_ENTRY.match(line.strip())
+                    if match:
+                        timestamp, exit_code, cmd_id, command = match.groups()
+                        entries.append((timestamp.decode(), int(exit_code), cmd_id.decode(), command.decode('utf-8', 'replace')))
+                        if len(entries) == limit:
+                            break
                 
-            parts = line.split('|', 3)  # Split into 4 parts
-            if len(parts) < 4:
-                continue
+                # Read the whole file if long entries mean the tail didn't hold enough of them
+                if len(entries) == limit or not offset:
+                    entries.reverse()
+                    return entries
+                offset = 0
+    except FileNotFoundError:
+        return []
+
+def get_recent_commands_with_outputs(limit: int = 5) -> Dict[str, Any]:
+    """
+    Get recent commands and their outputs from the automatic logging system.
+    Optimized for fast retrieval of exactly what's needed.
+    
+    Args:
+        limit: Maximum number of commands to retrieve (default: 5)
         
-        timestamp, exit_code_str, cmd_id, command = parts
+    Returns:
+        Dict of parallel lists ("timestamps", "commands", "exit_codes", "outputs"), most recent first,
+        plus a "has_outputs" flag. Commands without a logged output have an empty string in "outputs".
+    """
+    result = {
+        "timestamps": [],
+        "commands": [],
+        "exit_codes": [],
+        "outputs": [],
+        "has_outputs": False
+    }
+    
+    try:
+        # Get the most recent entries from the commands log (oldest first)
+        entries = read_log_tail(_CMDS_LOG, limit)
+        if not entries:
+            return result
         
-        # Create command entry
-        cmd_entry = {
-            "command": command,
-            "timestamp": timestamp
-        }
+        # List output files once instead of checking for each command's file separately
+        with os.scandir(_OUTPUT_DIR) as dir_entries:
+            output_files = {dir_entry.name: dir_entry.path for dir_entry in dir_entries if dir_entry.name.startswith("output_") and dir_entry.name.endswith(".log")}
         
-        # Add exit code if available
-        try:
-            cmd_entry["exit_code"] = int(exit_code_str)
-        except ValueError:
-            pass
+        # Process commands (most recent first)
+        for timestamp, exit_code, cmd_id, command in reversed(entries):
+            output = ""
             
-        # Check for output file
-        output_path = os.path.expanduser(f"~/.terminai/output_{cmd_id}.log")
-        if os.path.exists(output_path):
-            try:
-                with open(output_path, 'r') as f:
-                    output = f.read()
-                cmd_entry["output"] = output
-                has_outputs = True
-            except:
-                pass
-        
-        commands.append(cmd_entry)
-    except Exception as e:
-        # Handle any errors by returning an empty result
-        return {"commands": [], "has_outputs": False, "error": str(e)}
+            # Look for corresponding output file 
+            output_file = output_files.get(f"output_{cmd_id}.log")
+            if output_file:
+                try:
+                    with open(output_file, 'r') as f:
+                        output = f.read().strip()
+                    
+                    if output:
+                        result["has_outputs"] = True
+                except OSError:
+                    # If we can't read the output, just continue without it
+                    output = ""
+            
+            result["timestamps"].append(timestamp)
+            result["commands"].append(command)
+            result["exit_codes"].append(exit_code)
+            result["outputs"].append(output)
+        return result
     
-    return {"commands": commands, "has_outputs": has_outputs}
-        
\ No newline at end of file
+    except Exception as e:
+        import logging      # Only needed on this error path
+        logging.getLogger(__name__).warning(f"Error reading command history: {e}")
+        return result
@@ -1,22 +1,14 @@
-import click
-from rich.console import Console
-
-console = Console()         # Initializing the console for rich text
-
-# Define the main command group
-@click.group()
-@click.version_option(version="0.1.0")
-def cli():
-    """TerminAI: Your AI-powered terminal assistant."""
-    pass
-
-# Defining the ask command 
-@cli.command(name="ask")
-@click.argument("query")
-def ask(query):
-    """Ask for a specific terminal command or workflow help."""
+import argparse
+from typing import List, Optional
+
+__version__ = "0.1.0"
+
+# Command callbacks. Handlers are imported lazily, so only the dispatched command's modules are loaded
+
+def ask(args: argparse.Namespace) -> None:
     from .commands.ask import handle_ask_command        # Lazy importing for faster startup and dependency separation
-    handle_ask_command(query)
+    from .core.context import get_terminal_context
+    handle_ask_command(args.query, context=get_terminal_context())
 
 '''
 Goals for the debug command -
@@ -25,35 +17,73 @@ terminai debug "error message" -c - Analyzes a specific error with context
 terminai debug -a - Automatically analyzes recent terminal activity with context
 '''
 
-@cli.command(name="debug")
-@click.argument("error_message", required=False) # Option argument
-@click.option('--context', '-c', is_flag=True, help="Include your recent commands and outputs as context")
-@click.option('--auto', '-a', is_flag=True,help="Automatically analyze recent terminal activity without specifying an error")
-def debug(error_message, context, auto):
-    """
-    Get detailed explanations and fixes for terminal errors.
-    
-    Run without arguments to analyze recent terminal activity automatically.
-    """
+def debug(args: argparse.Namespace) -> None:
     from .commands.debug import handle_debug_command
-    handle_debug_command(error_message, context or auto)
+    from .core.context import get_terminal_context
+    handle_debug_command(args.error_message, args.context or args.auto, auto_analyse=args.auto,     # Auto-analysis always includes context
+                         context=get_terminal_context())
 
-# Shortcut sub-command
-@cli.command(name="-debug")
-def auto_debug():
-    """Automatically analyze recent terminal activity."""
-    from .commands.debug import handle_debug_command
-    handle_debug_command(None, True, auto_analyze=True)     # Calling handler with auto-analysis mode enabled and forced context inclusion.
+def init(args: argparse.Namespace) -> None:
+    from .commands.init import handle_init_command
+    handle_init_command(args.force)
+
+def session(args: argparse.Namespace) -> None:
+    from .commands.session import handle_session_command
+    handle_session_command()
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the CLI and its subcommands"""
+    parser = argparse.ArgumentParser(prog="terminai", description="TerminAI: Your AI-powered terminal assistant.")
+    parser.add_argument("--version", action="version", version=f"TerminAI version {__version__}")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show diagnostic log messages")
+    subparsers = parser.add_subparsers(title="commands", metavar="COMMAND")
+
+    # Defining the ask command
+    ask_parser = subparsers.add_parser("ask", help="Ask for a specific terminal command or workflow help.",
+                                       description="Ask for a specific terminal command or workflow help.")
+    ask_parser.add_argument("query")
+    ask_parser.set_defaults(func=ask)
 
-# Defining the version command 
-@cli.command()
-def version():
-    """Display the version of TerminAI."""
-    console.print("[bold]TerminAI[/bold] version 0.1.0")
+    # Defining the debug command
+    debug_parser = subparsers.add_parser("debug", help="Get detailed explanations and fixes for terminal errors.",
+                                         description="Get detailed explanations and fixes for terminal errors. "
+                                                     "Use -a to analyze recent terminal activity automatically.")
+    debug_parser.add_argument("error_message", nargs="?")      # Optional argument
+    debug_parser.add_argument("--context", "-c", action="store_true", help="Include your recent commands and outputs as context")
+    debug_parser.add_argument("--auto", "-a", action="store_true", help="Automatically analyze recent terminal activity without specifying an error")
+    debug_parser.set_defaults(func=debug)
 
-def main():
+    # Defining the init command
+    init_parser = subparsers.add_parser("init", help="Set up automatic command logging for debugging context.",
+                                        description="Set up automatic command logging for debugging context.")
+    init_parser.add_argument("--force", "-f", action="store_true", help="Overwrite an existing configuration without asking")
+    init_parser.set_defaults(func=init)
+
+    # Defining the session command
+    session_parser = subparsers.add_parser("session", help="Start an interactive session that reuses terminal context across queries.",
+                                           description="Start an interactive session that reuses terminal context across queries.")
+    session_parser.set_defaults(func=session)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main entry point for the CLI."""
-    cli()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        import logging
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+
+    # Show help when no command is given
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return
+
+    args.func(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,165 @@
+#!/bin/bash
+# TerminAI Command and Output Logger
+# Automatically logs last 5 commands and their exit codes with minimal performance impact
+
+# Create log directory if it doesn't exist 
+mkdir -p ~/.terminai
+
+# Last 5 logged commands and their IDs, kept in memory so rotating the log needs no external processes
+TERMINAI_CMDS=()
+TERMINAI_CMD_IDS=()
+if [ -f ~/.terminai/commands.log ]; then
+    while IFS= read -r terminai_line; do
+        [ -n "$terminai_line" ] || continue
+        TERMINAI_CMDS+=("$terminai_line")
+        # Entry format: timestamp|exit_code|cmd_id|command
+        terminai_rest=${terminai_line#*|}
+        terminai_rest=${terminai_rest#*|}
+        TERMINAI_CMD_IDS+=("${terminai_rest%%|*}")
+    done < ~/.terminai/commands.log
+    unset terminai_line terminai_rest
+fi
+
+# Appends since the log was last compacted
+TERMINAI_APPENDS=0
+unset TERMINAI_PREV_HISTNUM
+
+# Zsh: load the datetime module for fork-free timestamps and command IDs
+if [ -n "$ZSH_VERSION" ]; then
+    zmodload zsh/datetime
+fi
+
+# Bash 4.2+ can format timestamps with printf; older versions (e.g. macOS /bin/bash 3.2) fall back to date
+TERMINAI_PRINTF_TIME=
+if [ -n "$BASH_VERSION" ] && (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 2) )); then
+    TERMINAI_PRINTF_TIME=1
+fi
+
+# Bash 4.4+ expands PS0 before running each command, which lets the prompt hook tell whether a command ran
+TERMINAI_HAS_PS0=
+if [ -n "$BASH_VERSION" ] && (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 4) )); then
+    TERMINAI_HAS_PS0=1
+fi
+TERMINAI_RAN=
+
+# Get the command that just ran without piping history through sed
+terminai_last_command() {
+    if [ -n "$ZSH_VERSION" ]; then
+        # Recorded by the preexec hook, so no history lookup is needed
+        TERMINAI_LAST_COMMAND=$TERMINAI_PENDING_COMMAND
+        TERMINAI_PENDING_COMMAND=
+    else
+        # fc -ln -1 is off by one when run from PROMPT_COMMAND on bash 5.2, so read the last history entry instead
+        local last
+        last=$(HISTTIMEFORMAT= builtin history 1)
+        last=${last#"${last%%[![:space:]]*}"}       # Trim leading whitespace
+        local histnum=${last%%[!0-9]*}
+        last=${last#*[0-9][[:space:]]}              # Drop the history number
+        TERMINAI_LAST_COMMAND=${last#"${last%%[![:space:]]*}"}
+        
+        if [ -n "$TERMINAI_HAS_PS0" ]; then
+            # The flag is set by PS0 only when a command ran, so an empty Enter logs nothing while a rerun that
+            # HISTCONTROL=ignoredups kept out of history is still logged
+            [ -n "$TERMINAI_RAN" ] || TERMINAI_LAST_COMMAND=
+            TERMINAI_RAN=
+        else
+            # Older bash: an unchanged history number means no new command ran (reruns under ignoredups are
+            # missed). The first prompt after loading only records the number, so the previous session's last
+            # command isn't logged again
+            if [ -z "${TERMINAI_PREV_HISTNUM+set}" ] || [ "$histnum" = "$TERMINAI_PREV_HISTNUM" ]; then
+                TERMINAI_LAST_COMMAND=
+            fi
+            TERMINAI_PREV_HISTNUM=$histnum
+        fi
+    fi
+}
+
+# Prompt hook: read the exit code and last command once, then log them
+terminai_log_command() {
+    local exit_code=$?
+    terminai_last_command
+    [ -n "$TERMINAI_LAST_COMMAND" ] || return 0
+    terminai_log_command_output "$exit_code" "$TERMINAI_LAST_COMMAND"
+}
+
+# Function to log a command with its exit code
+terminai_log_command_output() {
+    # Get command and exit code
+    local exit_code=$1
+    local cmd="$2"
+    local timestamp
+    if [ -n "$ZSH_VERSION" ]; then
+        strftime -s timestamp '%Y-%m-%d %H:%M:%S' $EPOCHSECONDS
+    elif [ -n "$TERMINAI_PRINTF_TIME" ]; then
+        printf -v timestamp '%(%Y-%m-%d %H:%M:%S)T' -1
+    else
+        timestamp=$(date '+%Y-%m-%d %H:%M:%S')
+    fi
+
+    # Don't log terminai commands to avoid noise 
+    if [[ $cmd != terminai* ]]; then 
+        # Create a unique ID for this command to link the command with any output file
+        local cmd_id
+        if [ -n "$EPOCHREALTIME" ]; then
+            cmd_id=${EPOCHREALTIME//[!0-9]/}    # Builtin clock (bash 5+, zsh/datetime) with the decimal point removed
+        else
+            cmd_id=$RANDOM$RANDOM$$
+        fi
+        # Record command with metadata 
+        local entry="${timestamp}|${exit_code}|${cmd_id}|${cmd}"
+        TERMINAI_CMDS+=("$entry")
+        TERMINAI_CMD_IDS+=("$cmd_id")
+
+        # Keep only the last 5 commands, removing the output files of evicted ones
+        local evicted_id
+        while (( ${#TERMINAI_CMD_IDS[@]} > 5 )); do
+            evicted_id=${TERMINAI_CMD_IDS[@]:0:1}
+            [ -f ~/.terminai/output_${evicted_id}.log ] && rm -f ~/.terminai/output_${evicted_id}.log
+            TERMINAI_CMD_IDS=("${TERMINAI_CMD_IDS[@]:1}")
+            TERMINAI_CMDS=("${TERMINAI_CMDS[@]:1}")
+        done
+
+        # Append the entry, and only now and then compact the log back to the last 5 entries
+        printf '%s\n' "$entry" >> ~/.terminai/commands.log
+        if (( ++TERMINAI_APPENDS >= 50 )); then
+            printf '%s\n' "${TERMINAI_CMDS[@]}" > ~/.terminai/commands.log
+            TERMINAI_APPENDS=0
+        fi
+    fi
+}
+
+# Set up shell-specific hooks (optimized for performance)
+if [ -n "$BASH_VERSION" ]; then
+    # For Bash
+    # Store original PROMPT_COMMAND
+    if [ -z "$ORIGINAL_PROMPT_COMMAND" ]; then
+        ORIGINAL_PROMPT_COMMAND="$PROMPT_COMMAND"
+    fi
+
+    # Use PROMPT_COMMAND for logging
+    # This runs just before the prompt is displayed
+    PROMPT_COMMAND='terminai_log_command;'${ORIGINAL_PROMPT_COMMAND:+$ORIGINAL_PROMPT_COMMAND}
+
+    # Mark each command that runs from PS0. The expansion itself is empty, and the arithmetic sets the flag
+    # without forking
+    if [ -n "$TERMINAI_HAS_PS0" ] && [[ $PS0 != *TERMINAI_RAN* ]]; then
+        PS0=$PS0'${TERMINAI_RAN:0:$((TERMINAI_RAN=1, 0))}'
+    fi
+elif [ -n "$ZSH_VERSION" ]; then
+    # For Zsh
+    # preexec runs before command execution and receives the command line as $1
+    preexec() {
+        TERMINAI_PENDING_COMMAND=$1
+    }
+
+    # precmd runs after command completes, before prompt display
+    precmd() {
+        terminai_log_command
+    }
+fi
+
+# Print initialization message only once per session
+if [ -z "$TERMINAI_INITIALIZED" ]; then
+    export TERMINAI_INITIALIZED=1
+    echo "TerminAI command logging initialized (automatically capturing last 5 commands)."
+fi